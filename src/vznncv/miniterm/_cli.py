@@ -1,203 +1,9 @@
 import argparse
-import json
 import logging
-import re
 import sys
-import time
-from functools import partial
-from typing import Union
-
-import serial.tools.list_ports
 
 from ._miniterm import miniterm as _miniterm_entrypoint
-
-
-class SerialPortSearcher:
-    """
-    Helper class to search serial port with specified filters.
-    """
-    _CACHED_PORT_TIME = 0.5
-    _cached_ports = (None, None)
-
-    @classmethod
-    def list_comports(cls):
-
-        # check cached results
-        last_timestamp = cls._cached_ports[0]
-        if last_timestamp is not None and last_timestamp + cls._CACHED_PORT_TIME > time.time():
-            return cls._cached_ports[1]
-
-        # scan serial ports
-        serial_ports = list(serial.tools.list_ports.comports())
-        # clear unknown ports
-        serial_ports = [port for port in serial_ports if port.location]
-        # add interface number to port data
-        for port in serial_ports:
-            m = re.search(r':.*\.(\d+)$', port.location)
-            if m is None:
-                port.interface_number = None
-            else:
-                port.interface_number = int(m.group(1))
-
-        cls._cached_ports = (time.time(), serial_ports)
-        return serial_ports
-
-    _FILED_FILTERS = {
-        'vid': dict(
-            type=partial(int, base=16),
-            description="vendor id",
-            port_info_field='vid'
-        ),
-        'pid': dict(
-            type=partial(int, base=16),
-            description="product id",
-            port_info_field='pid'
-        ),
-        'serial_number': dict(
-            type=str,
-            description="unique serial port number (note: it may absent)",
-            port_info_field='serial_number'
-        ),
-        'ifno': dict(
-            type=int,
-            description="usb device interface number if it contains multiple interfaces",
-            port_info_field='interface_number'
-        ),
-        'port': dict(
-            type=str,
-            description="explicit serial device path",
-            port_info_field='device'
-        )
-    }
-
-    @classmethod
-    def _format_usb_id(cls, vid, pid):
-        if vid is None or pid is None:
-            return 'n/a'
-        else:
-            return f'{vid:04X}:{pid:04X}'
-
-    @classmethod
-    def port_description(cls, port):
-        return f'{port.device}; {port.description}; ' \
-               f'{port.hwid}{f" (ifno = {port.interface_number})" if port.interface_number is not None else ""}'
-
-    @classmethod
-    def format_comports(cls, ports=None):
-        """
-        Create message with serial ports
-        """
-        if ports is None:
-            ports = cls.list_comports()
-        return '\n'.join(f'- {cls.port_description(port)}' for port in ports)
-
-    @classmethod
-    def format_filter_help(cls):
-        """
-        Create filter description.
-        """
-        help_lines = []
-
-        help_lines.append(
-            'Filter represent json object {"k1": "v1", "k2": "v2", ... } or string k1=v1&&k2=v2&&... with '
-            'the following fields:')
-        for field_name, field_definition in cls._FILED_FILTERS.items():
-            help_lines.append(f'- {field_name} - {field_definition["description"]}')
-        return '\n'.join(help_lines)
-
-    _KV_FILTER_RE = re.compile(r'^(?P<name>[\w]+)={1,2}(?P<value>[\w-]+)$')
-
-    @classmethod
-    def _load_filter_info_from_str(cls, filter_info: str) -> dict:
-        try:
-            # try to parse filter as json string
-            return json.loads(filter_info)
-        except Exception:
-            pass
-        # try to parse string as k1=v1&&k2=v2&&k3=v3 string
-        result = {}
-        for field_filter in filter_info.strip().split("&&"):
-            m = cls._KV_FILTER_RE.match(field_filter)
-            if m is None:
-                raise ValueError(f"Invalid filter expression \"{field_filter}\" in \"{filter_info}\"")
-            result[m.group('name')] = m.group('value')
-        return result
-
-    def __init__(self, filter_info: Union[dict, str, None], no_input: bool = True):
-        if filter_info is None:
-            filter_info = {}
-        elif isinstance(filter_info, str):
-            filter_info = self._load_filter_info_from_str(filter_info)
-        self._raw_filter_info = filter_info
-        self._filter_info = {}
-        self._no_input = no_input
-        # check filter definition
-        for k, v in filter_info.items():
-            k = k.lower()
-            if k not in self._FILED_FILTERS:
-                raise ValueError(f"Unknown filter field \"{k}\"")
-            try:
-                self._filter_info[k] = self._FILED_FILTERS[k]['type'](v)
-            except Exception as e:
-                raise ValueError(f"Invalid value \"{v}\" of field \"{k}\"") from e
-
-    def _format_filter_info(self):
-        return "serial filter {}".format(' and '.join(f'{k} == {v}' for k, v in self._filter_info.items()))
-
-    class ResolveError(ValueError):
-        pass
-
-    def _filter_impl(self, ports):
-        matched_ports = []
-        for port in ports:
-            for field_name, expected_value in self._filter_info.items():
-                filter_definition = self._FILED_FILTERS[field_name]
-                port_value = getattr(port, filter_definition['port_info_field'])
-                if expected_value != port_value:
-                    break
-            else:
-                matched_ports.append(port)
-        return matched_ports
-
-    def filter(self):
-        """
-        Return serial ports that are matched to a filter
-        """
-        ports = self.list_comports()
-        return self._filter_impl(ports)
-
-    def list_filtered_ports(self):
-        return self._filter_impl(self.list_comports())
-
-    def resolve(self):
-        """
-        Resolve serial port.
-        """
-        ports = self.list_comports()
-        matched_ports = self._filter_impl(ports)
-
-        if len(matched_ports) == 0:
-            raise self.ResolveError(f"No ports found with {self._format_filter_info()}\n"
-                                    f"Available serial ports:\n{self.format_comports(ports)}")
-        elif len(matched_ports) > 1:
-            if self._no_input:
-                raise self.ResolveError(f"Multiple com ports are found with {self._format_filter_info()}\n"
-                                        f"Found serial ports:\n{self.format_comports(matched_ports)}")
-            print(f"Found {len(matched_ports)} serial ports")
-            for i, port in enumerate(matched_ports, start=1):
-                print(f"{i} - {self.port_description(port)}")
-            while True:
-                choice = input(f'Please enter a port number [1-{len(matched_ports)}]: ')
-                try:
-                    port = matched_ports[int(choice) - 1]
-                except Exception:
-                    print(f"Invalid input \"{choice}\"!")
-                else:
-                    break
-        else:
-            port = matched_ports[0]
-
-        return port.device
+from ._serial_ports import SerialPortSearcher
 
 
 _DEFAULT_BAUDRATE = 9600
@@ -12,13 +12,20 @@ from typing import Optional
 import prompt_toolkit
 import prompt_toolkit.lexers
 import prompt_toolkit.shortcuts
-import serial.tools.list_ports
 import serial_asyncio
 from prompt_toolkit.application import in_terminal
 from prompt_toolkit.formatted_text import FormattedText
 from prompt_toolkit.key_binding import KeyBindings
 from serial.tools.list_ports_common import ListPortInfo
 
+from ._serial_ports import SerialPortSearcher
+
+try:
+    import termios
+except ImportError:
+    # termios isn't available on windows
+    termios = None
+
 logger = logging.getLogger("vznncv-miniterm")
 
 
@@ -74,11 +81,13 @@ class InteractiveShell(prompt_toolkit.PromptSession):
         text = self._cleanup_text(text)
         prompt_toolkit.print_formatted_text(FormattedText([(self._sync_output_color, text)]), end='')
 
-    async def write_line_async(self, text):
-        text = self._cleanup_text(text)
-        text = text.strip()
+    async def write_lines_async(self, lines):
+        # prepare text before terminal acquisition, as it's the same for all lines
+        cleanup_text = self._cleanup_text
+        color = self._async_output_color
+        formatted_text = FormattedText([(color, cleanup_text(line).strip() + '\n') for line in lines])
         async with in_terminal():
-            prompt_toolkit.print_formatted_text(FormattedText([(self._async_output_color, text)]), end='\n')
+            prompt_toolkit.print_formatted_text(formatted_text, end='')
 
 
 ##
@@ -88,9 +97,9 @@ class InteractiveShell(prompt_toolkit.PromptSession):
 class Transform(object):
     """do-nothing: forward all data unchanged"""
 
-    def rx(self, text):
-        """text received from serial port"""
-        return text
+    # bytes.translate arguments that are applied to data received from serial port
+    rx_table = None
+    rx_delete = b''
 
     def tx(self, text):
         """text to be sent to serial port"""
@@ -100,8 +109,7 @@ class Transform(object):
 class CRLF(Transform):
     """ENTER sends CR+LF"""
 
-    def rx(self, text):
-        return text.replace('\r', '')
+    rx_delete = b'\r'
 
     def tx(self, text):
         return text.replace('\n', '\r\n')
@@ -110,8 +118,7 @@ class CRLF(Transform):
 class CR(Transform):
     """ENTER sends CR"""
 
-    def rx(self, text):
-        return text.replace('\r', '\n')
+    rx_table = bytes.maketrans(b'\r', b'\n')
 
     def tx(self, text):
         return text.replace('\n', '\r')
@@ -146,7 +153,7 @@ def _canonic_port_form(port):
 
 
 def _check_device(port: str) -> ListPortInfo:
-    serial_ports = list(serial.tools.list_ports.comports())
+    serial_ports = SerialPortSearcher.list_all_comports()
 
     for serial_port in serial_ports:
         if serial_port.device == port:
@@ -167,30 +174,66 @@ class _SerialOutput(asyncio.Protocol):
         self._transform: Transform = transform
         self._loop = loop
         self._transport: Optional[serial_asyncio.SerialTransport] = None
-        self._buf = []
+        self._buf = bytearray()
         self._newline_sep = transform.tx('\n').encode('utf-8')[0:1]
+        self._rx_table = transform.rx_table
+        self._rx_delete = transform.rx_delete
+        self._rx_translate = transform.rx_table is not None or bool(transform.rx_delete)
+        self._lines_queue = asyncio.Queue()
+        self._write_lines_task: Optional[asyncio.Task] = None
 
     def connection_made(self, transport: serial_asyncio.SerialTransport):
         self._transport = transport
         self._buf.clear()
+        self._write_lines_task = self._loop.create_task(self._write_lines_async())
+
+    async def _write_lines_async(self):
+        lines_queue = self._lines_queue
+        while True:
+            lines = await lines_queue.get()
+            # join all lines that have been received while terminal output was in progress
+            while not lines_queue.empty():
+                lines.extend(lines_queue.get_nowait())
+            try:
+                await self._ps.write_lines_async(lines)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # skip failed lines, but keep output of the next ones
+                logger.exception("Failed to print received lines")
 
     def _consume_data(self, data):
-        data_blocks = data.split(self._newline_sep)
-        self._buf.append(data_blocks[0])
-        for next_block in data_blocks[1:]:
-            raw_line = b''.join(self._buf)
-            self._buf.clear()
-            self._buf.append(next_block)
-
-            line = raw_line.decode(encoding='utf-8', errors="ignore")
-            line = self._transform.rx(line)
-            asyncio.ensure_future(self._ps.write_line_async(line), loop=self._loop)
+        buf = self._buf
+        buf.extend(data)
+        newline_sep = self._newline_sep
+        rx_translate = self._rx_translate
+        rx_table = self._rx_table
+        rx_delete = self._rx_delete
+        lines = []
+        start = 0
+        while True:
+            end = buf.find(newline_sep, start)
+            if end < 0:
+                break
+            raw_line = buf[start:end]
+            if rx_translate:
+                raw_line = raw_line.translate(rx_table, rx_delete)
+            lines.append(raw_line.decode(encoding='utf-8', errors="ignore"))
+            start = end + 1
+        # keep only incomplete line in the buffer
+        del buf[:start]
+        if lines:
+            self._lines_queue.put_nowait(lines)
 
     def data_received(self, data):
         self._consume_data(data)
 
     def connection_lost(self, exc):
-        self._consume_data(self._newline_sep)
+        # note: the event loop is stopped below, so the incomplete line and lines
+        #       that haven't been printed yet are discarded on disconnect
+        if self._write_lines_task is not None:
+            self._write_lines_task.cancel()
+            self._write_lines_task = None
         self._transport.loop.stop()
         self._transport = None
         self._buf.clear()
@@ -199,12 +242,10 @@ class _SerialOutput(asyncio.Protocol):
 
 
 async def _process_input_async(ps: InteractiveShell, transport: serial_asyncio.SerialTransport, transform: Transform):
-    newline_sym = transform.tx('\n')
+    newline_bytes = transform.tx('\n').encode('utf-8')
     while True:
         tx_data = await ps.prompt_async()
-        tx_data = tx_data + newline_sym
-        tx_data = tx_data.encode('utf-8')
-        transport.write(tx_data)
+        transport.write(tx_data.encode('utf-8') + newline_bytes)
 
 
 async def _async_serial_console(ps: InteractiveShell, port: str, baudrate: int, transform: Transform):
@@ -218,10 +259,19 @@ async def _async_serial_console(ps: InteractiveShell, port: str, baudrate: int,
     asyncio.ensure_future(_process_input_async(ps, transport, transform))
 
 
-def _clear_tty_settings():
-    stty_path = shutil.which('stty')
-    if stty_path is not None:
-        subprocess.check_call([stty_path, 'sane'])
+def _save_tty_settings():
+    if termios is None or not sys.stdin.isatty():
+        return None
+    return termios.tcgetattr(sys.stdin.fileno())
+
+
+def _restore_tty_settings(tty_settings):
+    if tty_settings is not None:
+        termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, tty_settings)
+    elif termios is None:
+        stty_path = shutil.which('stty')
+        if stty_path is not None:
+            subprocess.check_call([stty_path, 'sane'])
 
 
 ##
@@ -238,11 +288,9 @@ def miniterm(device: str, baudrate: int, eol='lf'):
     :return:
     """
     # resolve device description if it's available
-    for device_info in serial.tools.list_ports.comports():
-        if device_info.device == device:
-            device_description = device_info.description
-            break
-    else:
+    try:
+        device_description = _check_device(device).description
+    except ValueError:
         device_description = 'n/a'
 
     # resolve transform
@@ -250,6 +298,7 @@ def miniterm(device: str, baudrate: int, eol='lf'):
     transform = parse_transform(eol)()
 
     # run console
+    tty_settings = _save_tty_settings()
     ps = InteractiveShell(
         message='> ',
         sync_output_color='#7542f5',
@@ -285,7 +334,7 @@ def miniterm(device: str, baudrate: int, eol='lf'):
         ps.write_sync('Stop ...\n')
     finally:
         # restore tty settings
-        _clear_tty_settings()
+        _restore_tty_settings(tty_settings)
 
         if ps.last_exc is not None:
             print(f"ERROR: {ps.last_exc}", file=sys.stderr)
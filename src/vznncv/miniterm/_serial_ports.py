@@ -0,0 +1,235 @@
+import json
+import time
+from functools import partial
+from operator import attrgetter
+from typing import Optional, Union
+
+import serial.tools.list_ports
+
+
+class SerialPortSearcher:
+    """
+    Helper class to search serial port with specified filters.
+    """
+    _CACHED_PORT_TIME = 2.0
+    _cached_ports = (None, None, None)
+
+    @staticmethod
+    def _parse_interface_number(location: str) -> Optional[int]:
+        # location has format "<bus>-<port path>:<config>.<interface number>"
+        location_prefix, _, interface_number = location.rpartition('.')
+        if ':' in location_prefix and interface_number.isdecimal():
+            return int(interface_number)
+        return None
+
+    @classmethod
+    def _scan_comports(cls):
+        # check cached results
+        expiration_timestamp, all_serial_ports, serial_ports = cls._cached_ports
+        if expiration_timestamp is not None and expiration_timestamp > time.monotonic():
+            return all_serial_ports, serial_ports
+
+        # scan serial ports
+        all_serial_ports = list(serial.tools.list_ports.comports())
+        # clear unknown ports
+        serial_ports = [port for port in all_serial_ports if port.location]
+        # add interface number to port data
+        for port in serial_ports:
+            port.interface_number = cls._parse_interface_number(port.location)
+
+        cls._cached_ports = (time.monotonic() + cls._CACHED_PORT_TIME, all_serial_ports, serial_ports)
+        return all_serial_ports, serial_ports
+
+    @classmethod
+    def list_all_comports(cls):
+        """
+        Return all serial ports including ports without location information (native UARTs, bluetooth, etc).
+        """
+        return cls._scan_comports()[0]
+
+    @classmethod
+    def list_comports(cls):
+        """
+        Return serial ports with known location.
+        """
+        return cls._scan_comports()[1]
+
+    _FILED_FILTERS = {
+        'vid': dict(
+            type=partial(int, base=16),
+            description="vendor id",
+            port_info_field='vid'
+        ),
+        'pid': dict(
+            type=partial(int, base=16),
+            description="product id",
+            port_info_field='pid'
+        ),
+        'serial_number': dict(
+            type=str,
+            description="unique serial port number (note: it may absent)",
+            port_info_field='serial_number'
+        ),
+        'ifno': dict(
+            type=int,
+            description="usb device interface number if it contains multiple interfaces",
+            port_info_field='interface_number'
+        ),
+        'port': dict(
+            type=str,
+            description="explicit serial device path",
+            port_info_field='device'
+        )
+    }
+
+    @classmethod
+    def _format_usb_id(cls, vid, pid):
+        if vid is None or pid is None:
+            return 'n/a'
+        else:
+            return f'{vid:04X}:{pid:04X}'
+
+    @classmethod
+    def port_description(cls, port):
+        return f'{port.device}; {port.description}; ' \
+               f'{port.hwid}{f" (ifno = {port.interface_number})" if port.interface_number is not None else ""}'
+
+    @classmethod
+    def format_comports(cls, ports=None):
+        """
+        Create message with serial ports
+        """
+        if ports is None:
+            ports = cls.list_comports()
+        port_description = cls.port_description
+        return '\n'.join([f'- {port_description(port)}' for port in ports])
+
+    @classmethod
+    def format_filter_help(cls):
+        """
+        Create filter description.
+        """
+        help_lines = []
+
+        help_lines.append(
+            'Filter represent json object {"k1": "v1", "k2": "v2", ... } or string k1=v1&&k2=v2&&... with '
+            'the following fields:')
+        for field_name, field_definition in cls._FILED_FILTERS.items():
+            help_lines.append(f'- {field_name} - {field_definition["description"]}')
+        return '\n'.join(help_lines)
+
+    @staticmethod
+    def _is_kv_filter_name(name: str) -> bool:
+        # equivalent of "[\w]+" regex
+        if not name:
+            return False
+        name = name.replace('_', '')
+        return not name or name.isalnum()
+
+    @staticmethod
+    def _is_kv_filter_value(value: str) -> bool:
+        # equivalent of "[\w-]+" regex
+        if not value:
+            return False
+        value = value.replace('_', '').replace('-', '')
+        return not value or value.isalnum()
+
+    @classmethod
+    def _load_filter_info_from_str(cls, filter_info: str) -> dict:
+        if filter_info.lstrip()[:1] == '{':
+            try:
+                # try to parse filter as json string
+                return json.loads(filter_info)
+            except ValueError:
+                pass
+        # try to parse string as k1=v1&&k2=v2&&k3=v3 string
+        result = {}
+        for field_filter in filter_info.strip().split("&&"):
+            # both "k=v" and "k==v" forms are allowed
+            name, _, value = field_filter.partition('=')
+            if value.startswith('='):
+                value = value[1:]
+            if not cls._is_kv_filter_name(name) or not cls._is_kv_filter_value(value):
+                raise ValueError(f"Invalid filter expression \"{field_filter}\" in \"{filter_info}\"")
+            result[name] = value
+        return result
+
+    def __init__(self, filter_info: Union[dict, str, None], no_input: bool = True):
+        if filter_info is None:
+            filter_info = {}
+        elif isinstance(filter_info, str):
+            filter_info = self._load_filter_info_from_str(filter_info)
+        self._raw_filter_info = filter_info
+        self._filter_info = {}
+        self._no_input = no_input
+        # check filter definition
+        for k, v in filter_info.items():
+            k = k.lower()
+            if k not in self._FILED_FILTERS:
+                raise ValueError(f"Unknown filter field \"{k}\"")
+            try:
+                self._filter_info[k] = self._FILED_FILTERS[k]['type'](v)
+            except Exception as e:
+                raise ValueError(f"Invalid value \"{v}\" of field \"{k}\"") from e
+        # prepare port getter and expected values to compare them without extra lookups
+        port_info_fields = [self._FILED_FILTERS[k]['port_info_field'] for k in self._filter_info]
+        if port_info_fields:
+            self._filter_port_getter = attrgetter(*port_info_fields)
+        else:
+            self._filter_port_getter = None
+        expected_values = tuple(self._filter_info.values())
+        # note: attrgetter returns scalar for single field
+        self._filter_expected_values = expected_values[0] if len(expected_values) == 1 else expected_values
+
+    def _format_filter_info(self):
+        return "serial filter {}".format(' and '.join(f'{k} == {v}' for k, v in self._filter_info.items()))
+
+    class ResolveError(ValueError):
+        pass
+
+    def _filter_impl(self, ports):
+        port_getter = self._filter_port_getter
+        if port_getter is None:
+            return list(ports)
+        expected_values = self._filter_expected_values
+        return [port for port in ports if port_getter(port) == expected_values]
+
+    def filter(self):
+        """
+        Return serial ports that are matched to a filter
+        """
+        ports = self.list_comports()
+        return self._filter_impl(ports)
+
+    def list_filtered_ports(self):
+        return self._filter_impl(self.list_comports())
+
+    def resolve(self):
+        """
+        Resolve serial port.
+        """
+        ports = self.list_comports()
+        matched_ports = self._filter_impl(ports)
+
+        if len(matched_ports) == 0:
+            raise self.ResolveError(f"No ports found with {self._format_filter_info()}\n"
+                                    f"Available serial ports:\n{self.format_comports(ports)}")
+        elif len(matched_ports) > 1:
+            if self._no_input:
+                raise self.ResolveError(f"Multiple com ports are found with {self._format_filter_info()}\n"
+                                        f"Found serial ports:\n{self.format_comports(matched_ports)}")
+            print(f"Found {len(matched_ports)} serial ports")
+            for i, port in enumerate(matched_ports, start=1):
+                print(f"{i} - {self.port_description(port)}")
+            while True:
+                choice = input(f'Please enter a port number [1-{len(matched_ports)}]: ')
+                try:
+                    port = matched_ports[int(choice) - 1]
+                except Exception:
+                    print(f"Invalid input \"{choice}\"!")
+                else:
+                    break
+        else:
+            port = matched_ports[0]
+
+        return port.device
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+import serial.tools.list_ports
+from hamcrest import assert_that, contains_exactly, equal_to
+from serial.tools.list_ports_common import ListPortInfo
+
+from vznncv.miniterm._miniterm import CR, CRLF, LF, _SerialOutput, _check_device
+from vznncv.miniterm._serial_ports import SerialPortSearcher
+
+
+@pytest.fixture
+def comports(monkeypatch):
+    uart_port = ListPortInfo('/dev/ttyS0', skip_link_detection=True)
+    uart_port.description = 'ttyS0'
+    usb_port = ListPortInfo('/dev/ttyACM0', skip_link_detection=True)
+    usb_port.description = 'STM32 STLink'
+    usb_port.location = '1-1.2:1.2'
+    ports = [uart_port, usb_port]
+
+    monkeypatch.setattr(serial.tools.list_ports, 'comports', lambda: list(ports))
+    monkeypatch.setattr(SerialPortSearcher, '_cached_ports', (None, None, None))
+    return ports
+
+
+def test_check_device(comports):
+    assert_that(_check_device('/dev/ttyACM0').description, equal_to('STM32 STLink'))
+
+
+def test_check_device_without_location(comports):
+    assert_that(_check_device('/dev/ttyS0').description, equal_to('ttyS0'))
+    # ports without location are still hidden from port search
+    assert_that([port.device for port in SerialPortSearcher.list_comports()], contains_exactly('/dev/ttyACM0'))
+
+
+def test_check_device_unknown_port(comports):
+    with pytest.raises(ValueError):
+        _check_device('/dev/ttyUSB5')
+
+
+class _StubShell:
+    def __init__(self):
+        self.batches = []
+        self.last_exc = None
+
+    async def write_lines_async(self, lines):
+        # InteractiveShell strips line whitespace, so compare lines in the same way
+        self.batches.append([line.strip() for line in lines])
+
+
+class _StubTransport:
+    pass
+
+
+def _receive(transform, chunks, *, yield_between_chunks=True):
+    """
+    Feed data chunks to serial protocol and return line batches that are passed to shell.
+    """
+    loop = asyncio.new_event_loop()
+    ps = _StubShell()
+
+    async def run():
+        protocol = _SerialOutput(ps=ps, transform=transform, loop=loop)
+        protocol.connection_made(_StubTransport())
+        for chunk in chunks:
+            protocol.data_received(chunk)
+            if yield_between_chunks:
+                for _ in range(3):
+                    await asyncio.sleep(0)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        protocol._write_lines_task.cancel()
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+    return ps.batches
+
+
+@pytest.mark.parametrize('transform', [LF(), CR(), CRLF()])
+def test_serial_output_multiple_lines_in_single_read(transform):
+    newline = transform.tx('\n').encode('utf-8')
+    data = b'line 1' + newline + b'line 2' + newline + b'line 3' + newline + b'incomplete'
+    assert_that(_receive(transform, [data]), contains_exactly(['line 1', 'line 2', 'line 3']))
+
+
+@pytest.mark.parametrize('transform', [LF(), CR(), CRLF()])
+def test_serial_output_split_multibyte_character(transform):
+    newline = transform.tx('\n').encode('utf-8')
+    data = 'caf\u00e9'.encode('utf-8') + newline
+    assert_that(_receive(transform, [data[:4], data[4:]]), contains_exactly(['caf\u00e9']))
+
+
+@pytest.mark.parametrize('transform', [LF(), CR(), CRLF()])
+def test_serial_output_split_crlf(transform):
+    chunks = [b'line 1\r', b'\nline 2\r', b'\n']
+    assert_that(_receive(transform, chunks), contains_exactly(['line 1'], ['line 2']))
+
+
+def test_serial_output_merge_pending_batches():
+    chunks = [b'line 1\n', b'line 2\nline 3\n']
+    assert_that(_receive(LF(), chunks, yield_between_chunks=False),
+                contains_exactly(['line 1', 'line 2', 'line 3']))
+
+
+def test_serial_output_connection_lost():
+    loop = asyncio.new_event_loop()
+    ps = _StubShell()
+    error = serial.SerialException('device disconnected')
+
+    class LoopStub:
+        def __init__(self):
+            self.stopped = False
+
+        def stop(self):
+            self.stopped = True
+
+    async def run():
+        protocol = _SerialOutput(ps=ps, transform=LF(), loop=loop)
+        transport = _StubTransport()
+        transport.loop = LoopStub()
+        protocol.connection_made(transport)
+        write_lines_task = protocol._write_lines_task
+        with pytest.raises(serial.SerialException):
+            protocol.connection_lost(error)
+        await asyncio.sleep(0)
+        return write_lines_task, transport.loop
+
+    try:
+        write_lines_task, transport_loop = loop.run_until_complete(run())
+    finally:
+        loop.close()
+    assert_that(write_lines_task.cancelled(), equal_to(True))
+    assert_that(transport_loop.stopped, equal_to(True))
+    assert_that(ps.last_exc, equal_to(error))
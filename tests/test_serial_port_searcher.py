@@ -0,0 +1,61 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to
+
+from vznncv.miniterm._serial_ports import SerialPortSearcher
+
+
+@pytest.fixture
+def ports():
+    return [
+        SimpleNamespace(device='/dev/ttyACM0', vid=0x0483, pid=0x374B, serial_number='A1', interface_number=2),
+        SimpleNamespace(device='/dev/ttyACM1', vid=0x0483, pid=0x374B, serial_number='B2', interface_number=2),
+        SimpleNamespace(device='/dev/ttyUSB0', vid=0x0403, pid=0x6001, serial_number=None, interface_number=0),
+    ]
+
+
+def _filter_devices(filter_info, ports):
+    return [port.device for port in SerialPortSearcher(filter_info)._filter_impl(ports)]
+
+
+def test_no_filter(ports):
+    assert_that(_filter_devices(None, ports), contains_exactly('/dev/ttyACM0', '/dev/ttyACM1', '/dev/ttyUSB0'))
+
+
+@pytest.mark.parametrize('filter_info', [
+    'vid=0483&&serial_number=B2',
+    'vid==0483&&serial_number==B2',
+    '{"vid": "0483", "serial_number": "B2"}',
+    {'vid': '0483', 'serial_number': 'B2'},
+])
+def test_filter(filter_info, ports):
+    assert_that(_filter_devices(filter_info, ports), contains_exactly('/dev/ttyACM1'))
+
+
+def test_single_field_filter(ports):
+    assert_that(_filter_devices('pid=374b', ports), contains_exactly('/dev/ttyACM0', '/dev/ttyACM1'))
+
+
+@pytest.mark.parametrize('filter_info', ['vid', 'vid=', 'vid=0483&&', 'unknown=1', 'ifno=abc'])
+def test_invalid_filter(filter_info):
+    with pytest.raises(ValueError):
+        SerialPortSearcher(filter_info)
+
+
+@pytest.mark.parametrize('location', [
+    '1-1.2:1.0',
+    '1-1.2:1.2',
+    '3-2:1.10',
+    '1-1.2',
+    '1-1:1.x',
+    '1-1:1.',
+    '1-1:1.²',
+    'usb',
+    '',
+])
+def test_parse_interface_number(location):
+    m = re.search(r':.*\.(\d+)$', location)
+    expected_interface_number = None if m is None else int(m.group(1))
+    assert_that(SerialPortSearcher._parse_interface_number(location), equal_to(expected_interface_number))